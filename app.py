@@ -1,13 +1,104 @@
+import asyncio
+import concurrent.futures
+import functools
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import diskcache
 import streamlit as st
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_community.tools import DuckDuckGoSearchRun
-from langchain.agents import create_react_agent, AgentExecutor
-from langchain_core.prompts import PromptTemplate
-from langchain.callbacks import StreamlitCallbackHandler
+from duckduckgo_search import DDGS
+from duckduckgo_search.exceptions import DuckDuckGoSearchException
+# google.genai (httpx, pydantic, google-auth) is imported inside the
+# functions that need it, so a page load without an API key never pays for it.
+
+from cache_keys import SYSTEM_INSTRUCTION_HASH, report_cache_key
+from prompts import ANALYST_BRIEF, REPORT_END, SYSTEM_INSTRUCTION
+
+logger = logging.getLogger(__name__)
 
 # --- Page Configuration ---
 st.set_page_config(page_title="360° Sales Analyst (Gemini)", page_icon="🕵️‍♂️", layout="wide")
 
+# --- Gemini Client ---
+# Every pasted key gets a client; bound them so stale keys age out.
+CLIENT_CACHE_MAX_ENTRIES = 64
+CLIENT_CACHE_TTL = 60 * 60
+# Per request, and between streamed chunks, so a stalled call frees its
+# agent worker instead of holding it forever.
+GEMINI_TIMEOUT_MS = 90_000
+
+def key_digest(api_key):
+    # Per-key caches hash on this, so raw keys never become cache keys.
+    return hashlib.sha256(api_key.encode()).hexdigest()
+
+@st.cache_resource(max_entries=CLIENT_CACHE_MAX_ENTRIES, ttl=CLIENT_CACHE_TTL, show_spinner=False)
+def load_client(digest, _api_key):
+    # One client per key: every call carries its own credentials, so one
+    # session's key can never be used for another session's requests.
+    from google import genai
+    from google.genai import types
+    return genai.Client(api_key=_api_key, http_options=types.HttpOptions(timeout=GEMINI_TIMEOUT_MS))
+
+def get_client(api_key):
+    return load_client(key_digest(api_key), api_key)
+
+# --- Model Discovery ---
+# Preferred models, best default first. Also the hard-coded fallback, so the
+# sidebar renders without a network call.
+DEFAULT_MODELS = ("models/gemini-2.5-flash", "models/gemini-2.5-pro", "models/gemini-2.5-flash-lite")
+MODELS_CACHE_FILE = Path("models.cache.json")
+MODELS_CACHE_TTL = 60 * 60  # new Gemini releases show up within the hour
+# Specialised Gemini variants list generateContent but reject tools or system
+# instructions. Matched by name, so this is best effort as new variants ship.
+EXCLUDED_MODEL_TAGS = ("tts", "image", "audio", "live", "embedding", "computer-use", "robotics")
+
+@st.cache_data(ttl=MODELS_CACHE_TTL, show_spinner=False)
+def fetch_working_models(_api_key) -> tuple[str, ...]:
+    # Every key sees the same public model list, so the key only authenticates
+    # the call and stays out of the cache key. Failures raise rather than
+    # return, so st.cache_data never pins a fallback for everyone.
+    if MODELS_CACHE_FILE.exists() and time.time() - MODELS_CACHE_FILE.stat().st_mtime < MODELS_CACHE_TTL:
+        # A fresh on-disk copy survives restarts, so cold starts skip the listing.
+        try:
+            models = tuple(json.loads(MODELS_CACHE_FILE.read_text()))
+        except (OSError, ValueError, TypeError):
+            models = ()
+        if models:
+            return models
+    listing = get_client(_api_key).models.list(config={"http_options": {"timeout": 2000}})
+    models = tuple(sorted(
+        # Gemma/LearnLM also list generateContent but reject system instructions and tools.
+        (m.name for m in listing
+         if 'generateContent' in (m.supported_actions or ()) and 'gemini' in m.name
+         and not any(tag in m.name for tag in EXCLUDED_MODEL_TAGS)),
+        reverse=True))
+    if not models:
+        raise RuntimeError("No Gemini models available for this key.")
+    try:
+        MODELS_CACHE_FILE.write_text(json.dumps(models))
+    except OSError:
+        pass
+    return models
+
+def get_working_models(api_key) -> tuple[str, ...]:
+    """The discovered models, or DEFAULT_MODELS when discovery fails this time."""
+    try:
+        return fetch_working_models(api_key)
+    except Exception:
+        return DEFAULT_MODELS
+
+def pick_default_model(models):
+    """Index of the most preferred model on offer, not whatever sorts first."""
+    for preferred in DEFAULT_MODELS:
+        if preferred in models:
+            return models.index(preferred)
+    return 0
+
 # --- Sidebar ---
 with st.sidebar:
     st.header("⚙️ Configuration")
@@ -21,37 +112,483 @@ with st.sidebar:
         api_key = st.text_input("Enter Gemini API Key", type="password")
         st.info("💡 Add 'GOOGLE_API_KEY' to your Secrets to skip this.")
 
+    available_models = get_working_models(api_key) if api_key else DEFAULT_MODELS
+    selected_model = st.selectbox("Model", available_models, index=pick_default_model(available_models))
+
 # --- Main Interface ---
 st.title("🕵️‍♂️ 360° Sales Analyst (Gemini Powered)")
 
-col1, col2 = st.columns(2)
-with col1:
-    target_company = st.text_input("Target Company", placeholder="e.g. Agilent")
-    business_unit = st.text_input("Business Unit", placeholder="e.g. Life Sciences")
-with col2:
-    competitors = st.text_input("Competitors", placeholder="e.g. Thermo Fisher")
-    user_context = st.text_area("Context", placeholder="Paste notes here...", height=100)
+# Inside a form, edits don't rerun the script until the brief is submitted.
+with st.form("brief_form"):
+    col1, col2 = st.columns(2)
+    with col1:
+        target_company = st.text_input("Target Company", placeholder="e.g. Agilent")
+        business_unit = st.text_input("Business Unit", placeholder="e.g. Life Sciences")
+    with col2:
+        competitors = st.text_input("Competitors", placeholder="e.g. Thermo Fisher")
+        user_context = st.text_area("Context", placeholder="Paste notes here...", height=100)
+    st.form_submit_button("📋 Build Brief", type="primary")
 
 # --- Prompt Builder ---
-def build_prompt(company, unit, comps, context):
-    return f"""
-    Act as a Senior Market Intelligence Analyst. Write a briefing for **{company}** ({unit} unit).
-    Compare against: {comps if comps else "Direct Competitors"}.
-    
-    Context: {context}
-    
-    SECTIONS:
-    1. Business Unit Health (Growth/Margins vs Competitors)
-    2. Strategic Initiatives (Funded Priorities)
-    3. Financial & Risk (Cash Flow, Layoffs, Risk Factors)
-    4. Soft Signals (Leadership Changes, Hiring)
-    
-    Format: Markdown Tables. No fluff.
+# Static instructions go first and the per-target fields last, so every
+# request shares the longest possible prefix (Gemini's implicit cache is prefix-matched).
+@st.cache_data(max_entries=64, show_spinner=False)
+def build_target_block(company, unit, comps, context):
+    return "\n".join((
+        f"TARGET: **{company}** ({unit} unit)",
+        f"COMPARE AGAINST: {comps if comps else 'Direct Competitors'}",
+        f"CONTEXT: {context}",
+    ))
+
+_PROMPT_PREFIX = ANALYST_BRIEF + "\n\n"
+
+def build_prompt(target_block):
+    """The standalone prompt shown in the copy tab; the agent gets the brief as its system instruction."""
+    return _PROMPT_PREFIX + target_block
+
+# --- Caches ---
+# Finished reports live in a cache_resource store rather than @st.cache_data:
+# they are written from the agent worker pool and evicted one key at a time.
+class TTLCache:
+    """Bounded, thread-safe LRU store whose entries expire after ttl seconds."""
+
+    def __init__(self, max_entries=256, ttl=3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            expire_at, text = item
+            if time.monotonic() > expire_at:
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return text
+
+    def pop(self, key):
+        with self._lock:
+            self._items.pop(key, None)
+
+    def set(self, key, text, expire_at=None):
+        # expire_at (a time.monotonic() deadline) overrides ttl, so an entry
+        # copied from another tier keeps the lifetime it had left there.
+        if expire_at is None:
+            expire_at = time.monotonic() + self.ttl
+        with self._lock:
+            self._items[key] = (expire_at, text)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+# A briefing on the same target and model stays useful for a day.
+REPORT_CACHE_TTL = 24 * 60 * 60
+REPORT_CACHE_MAX_ENTRIES = 2000
+
+REPORT_DISK_CACHE_DIR = ".report_cache"
+REPORT_DISK_CACHE_LIMIT = 100 * 1024 * 1024
+
+class ReportStore:
+    """Finished reports: a TTLCache in front of an on-disk diskcache.
+
+    Go through lookup/store/evict so both tiers stay in step.
+    """
+
+    def __init__(self, memory, disk):
+        self.memory = memory
+        self.disk = disk
+
+    def lookup(self, key):
+        report = self.memory.get(key)
+        if report is None:
+            report, expire_time = self.disk.get(key, expire_time=True)
+            if report is not None:
+                # Promote with the disk entry's remaining lifetime, not a fresh TTL.
+                remaining = expire_time - time.time() if expire_time else self.memory.ttl
+                self.memory.set(key, report, expire_at=time.monotonic() + remaining)
+        return report
+
+    def store(self, key, report):
+        self.memory.set(key, report)
+        self.disk.set(key, report, expire=self.memory.ttl)
+
+    def evict(self, key):
+        self.memory.pop(key)
+        self.disk.delete(key)
+
+@st.cache_resource
+def get_report_store():
+    # The disk tier survives restarts and redeploys on the same disk.
+    return ReportStore(
+        TTLCache(max_entries=REPORT_CACHE_MAX_ENTRIES, ttl=REPORT_CACHE_TTL),
+        diskcache.Cache(REPORT_DISK_CACHE_DIR, size_limit=REPORT_DISK_CACHE_LIMIT),
+    )
+
+@st.cache_resource
+def get_search_cache():
+    # Competitor names repeat across runs; a result stays good for 15 minutes.
+    return TTLCache(max_entries=512, ttl=900)
+
+# --- Search ---
+SEARCH_MAX_RESULTS = 5
+SEARCH_RETRIES = 3
+
+@st.cache_resource
+def get_search_client():
+    # One client per process, so every search reuses its pooled connections.
+    return DDGS()
+
+def search_once(client, query):
+    # DuckDuckGo rate-limits bursts; back off 1s, 2s before giving up.
+    for attempt in range(SEARCH_RETRIES):
+        try:
+            hits = client.text(query, max_results=SEARCH_MAX_RESULTS)
+            break
+        except DuckDuckGoSearchException:
+            if attempt == SEARCH_RETRIES - 1:
+                raise
+            time.sleep(2 ** attempt)
+    return "\n".join(f"{h['title']}: {h['body']} ({h['href']})" for h in hits) or "No results."
+
+def web_search(query: str) -> str:
+    """Search the web for recent news, financials, filings and hiring signals."""
+    return search_once(get_search_client(), query)
+
+async def search_all(client, cache, queries):
+    """Runs independent searches concurrently; a failed query is reported inline."""
+    found = {q: cache.get(q) for q in dict.fromkeys(queries)}
+    pending = [q for q, result in found.items() if result is None]
+    results = await asyncio.gather(*(asyncio.to_thread(search_once, client, q) for q in pending), return_exceptions=True)
+    for q, result in zip(pending, results):
+        if isinstance(result, Exception):
+            found[q] = f"Search failed: {result}"
+        else:
+            found[q] = result
+            cache.set(q, result)
+    return [found[q] for q in queries]
+
+# --- Research Agent ---
+MAX_AGENT_TURNS = 6
+# Four sections of tables fit comfortably; anything past this is drift.
+MAX_REPORT_TOKENS = 1500
+# Gemini 2.5 thinking tokens count against max_output_tokens, so cap the
+# thinking and add it on top of the report budget.
+THINKING_BUDGET = 1024
+
+class AgentError(RuntimeError):
+    """The agent finished without a full report (blocked, cut off, empty, or out of turns)."""
+
+def chunk_parts(chunk):
+    # Blocked or empty chunks come back without candidates or content.
+    if not chunk.candidates or not chunk.candidates[0].content:
+        return []
+    return chunk.candidates[0].content.parts or []
+
+def run_agent(client, config, model_name, prompt, run, search):
+    """Drives Gemini's native function-calling loop and returns the report.
+
+    Runs on the agent worker pool, so progress goes to run (an AgentRun)
+    rather than to Streamlit elements. Every web_search call the model emits
+    in one turn is dispatched concurrently through search and answered in a
+    single follow-up message.
     """
+    from google.genai import types
+
+    chat = client.chats.create(model=model_name, config=config)
+    message = prompt
+    for _ in range(MAX_AGENT_TURNS):
+        text, calls = [], []
+        blocked, finish_reason, usage, turn_started, first_text = None, None, None, time.monotonic(), None
+        for chunk in chat.send_message_stream(message):
+            if chunk.prompt_feedback and chunk.prompt_feedback.block_reason:
+                blocked = chunk.prompt_feedback.block_reason
+            if chunk.candidates and chunk.candidates[0].finish_reason:
+                finish_reason = chunk.candidates[0].finish_reason
+            usage = chunk.usage_metadata or usage
+            for part in chunk_parts(chunk):
+                if part.function_call:
+                    calls.append(part.function_call)
+                elif part.text:
+                    if first_text is None:
+                        first_text = time.monotonic()
+                    text.append(part.text)
+                    run.stream("".join(text))
+        if usage:
+            run.log_usage(usage.prompt_token_count or 0, usage.cached_content_token_count or 0)
+        if not calls:
+            # Raising here keeps truncated or blocked output out of the report cache.
+            if blocked:
+                raise AgentError(f"Gemini blocked the request ({blocked}).")
+            if finish_reason != types.FinishReason.STOP:
+                raise AgentError(f"Gemini stopped before finishing the report ({finish_reason}).")
+            if not text:
+                raise AgentError("Gemini returned no report.")
+            # Earlier turns may stream text before calling tools; only the answer turn counts.
+            run.ttft = first_text - turn_started
+            return "".join(text)
+
+        queries = [(fc.args or {}).get("query", "") for fc in calls]
+        run.log_queries(queries)
+        results = asyncio.run(search(queries))
+        message = [
+            types.Part.from_function_response(name=fc.name, response={"result": result})
+            for fc, result in zip(calls, results)
+        ]
+    raise AgentError(f"No report after {MAX_AGENT_TURNS} research turns.")
+
+# --- Model ---
+@st.cache_resource
+def get_agent_config(model_name):
+    # Shared by every chat on model_name; the SDK only reads it.
+    from google.genai import types
+    # Only 2.5 takes a thinking_budget; older models reject thinking_config outright.
+    budgeted = "gemini-2.5" in model_name
+    return types.GenerateContentConfig(
+        system_instruction=SYSTEM_INSTRUCTION,
+        tools=[web_search],
+        automatic_function_calling=types.AutomaticFunctionCallingConfig(disable=True),
+        temperature=0,
+        max_output_tokens=MAX_REPORT_TOKENS + THINKING_BUDGET,
+        thinking_config=types.ThinkingConfig(thinking_budget=THINKING_BUDGET) if budgeted else None,
+        stop_sequences=[REPORT_END],
+    )
+
+@st.cache_resource(max_entries=CLIENT_CACHE_MAX_ENTRIES, ttl=CLIENT_CACHE_TTL, show_spinner=False)
+def warm_up(model_name, digest, _api_key):
+    """Opens the key's connection in the background before the first run.
+
+    count_tokens is not billed but goes through the same TLS and auth path,
+    so the first "Run Analysis" click lands on a warm channel.
+    """
+    client = load_client(digest, _api_key)
+
+    def ping():
+        try:
+            client.models.count_tokens(model=model_name, contents="warm")
+        except Exception:
+            pass  # best effort; the real request will surface any error
+
+    threading.Thread(target=ping, daemon=True).start()
+
+# --- In-flight Runs ---
+# Identical submissions (a double click, another tab, or two users on the same
+# target) share one agent run instead of each paying for their own. Runs
+# execute on a process-wide worker pool, not in a session's script thread, so
+# a rerun or a closed tab only stops that session from following along.
+# GEMINI_TIMEOUT_MS bounds every call, so each run ends and frees its worker.
+INFLIGHT_WAIT_TIMEOUT = 300
+AGENT_WORKERS = 4
+
+class AgentRun:
+    """One agent run's progress, written by its worker and polled by sessions."""
+
+    def __init__(self):
+        self.future = concurrent.futures.Future()
+        self.started_at = None  # set when a worker picks the run up, not when it is queued
+        self.ttft = None
+        self.elapsed = None
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self._text = ""
+        self._queries = []
+        self._lock = threading.Lock()
+
+    def stream(self, text):
+        with self._lock:
+            self._text = text
+
+    def log_queries(self, queries):
+        with self._lock:
+            self._queries.extend(queries)
+
+    def log_usage(self, prompt_tokens, cached_tokens):
+        # The prefix hash ties the implicit-cache hit rate to one SYSTEM_INSTRUCTION.
+        logger.info("prefix=%s prompt_tokens=%d cached_tokens=%d",
+                    SYSTEM_INSTRUCTION_HASH, prompt_tokens, cached_tokens)
+        with self._lock:
+            self.prompt_tokens += prompt_tokens
+            self.cached_tokens += cached_tokens
+
+    def snapshot(self):
+        with self._lock:
+            return self._text, list(self._queries)
+
+@st.cache_resource
+def get_agent_executor():
+    return concurrent.futures.ThreadPoolExecutor(max_workers=AGENT_WORKERS, thread_name_prefix="agent")
+
+@st.cache_resource
+def get_inflight_runs():
+    return {"lock": threading.Lock(), "runs": {}}
+
+def start_run(key, job):
+    """Returns (run, started); job(run) is submitted only if key has no live run.
+
+    job executes on the worker pool and must not call Streamlit, so resolve
+    any cached objects it needs in the script thread first.
+    """
+    table, executor = get_inflight_runs(), get_agent_executor()
+    with table["lock"]:
+        run = table["runs"].get(key)
+        if run is not None:
+            return run, False
+        run = table["runs"][key] = AgentRun()
+
+    def work():
+        run.started_at = time.monotonic()
+        try:
+            outcome = job(run)
+        except Exception as exc:
+            outcome = exc
+        run.elapsed = time.monotonic() - run.started_at
+        with table["lock"]:
+            if table["runs"].get(key) is run:
+                del table["runs"][key]
+        if isinstance(outcome, Exception):
+            run.future.set_exception(outcome)
+        else:
+            run.future.set_result(outcome)
+
+    executor.submit(work)
+    return run, True
+
+def research_job(client, model_name, prompt, key):
+    """Wraps run_agent for the worker pool; the finished report is stored under key."""
+    config, store = get_agent_config(model_name), get_report_store()
+    search = functools.partial(search_all, get_search_client(), get_search_cache())
+
+    def job(run):
+        report = run_agent(client, config, model_name, prompt, run, search)
+        if report:
+            store.store(key, report)
+        return report
+
+    return job
+
+# --- Agent Pane ---
+def follow_run(run, status, placeholder, trace):
+    """Mirrors run's progress into this session until it finishes or times out.
+
+    The timeout counts from when a worker starts the run; time spent queued
+    behind other runs doesn't count against it.
+    """
+    queued, shown = run.started_at is None, None
+    if queued:
+        status.info("⏳ Waiting for a free research worker...")
+    while not run.future.done():
+        if run.started_at is None:
+            pass
+        elif queued:
+            queued = False
+            status.info("🔍 Gemini is thinking... (This may take 30s)")
+        elif time.monotonic() - run.started_at > INFLIGHT_WAIT_TIMEOUT:
+            return
+        progress = run.snapshot()
+        if progress != shown:
+            text, queries = shown = progress
+            if queries:
+                trace.markdown("\n".join(f"- 🔎 `{q}`" for q in queries))
+            if text:
+                placeholder.markdown(text)
+        concurrent.futures.wait([run.future], timeout=0.2)
+
+def research_live(target_block, api_key, selected_model, cache_key, regenerate=False):
+    client = get_client(api_key)
+    run, started = start_run(cache_key, research_job(client, selected_model, target_block, cache_key))
+
+    status = st.empty()
+    if started:
+        status.info("🔍 Gemini is thinking... (This may take 30s)")
+    else:
+        status.info("⏳ This briefing is already being researched, following that run...")
+    if regenerate and not started:
+        # That run began after the cached report, so its result is already a fresh sample.
+        st.info("🔄 A fresh run for this briefing was already in progress; Regenerate joined it instead of starting another.")
+    trace = st.expander("🧠 Research trace").empty()
+    st.markdown("### 📊 Analyst Report")
+    placeholder = st.empty()
+    follow_run(run, status, placeholder, trace)
+    status.empty()
+
+    if not run.future.done():
+        st.error("⏱️ The research run is taking too long. It keeps going in the background; run again shortly to pick up the report.")
+        return None
+    error = run.future.exception()
+    if error is not None:
+        from google.genai import errors
+
+        # Another run may have stored this briefing in the meantime.
+        report = get_report_store().lookup(cache_key)
+        if report is None:
+            placeholder.empty()
+            if isinstance(error, errors.APIError):
+                st.error(f"❌ Gemini API error: {error}")
+            elif isinstance(error, RuntimeError):
+                st.error(f"❌ {error}")
+            else:
+                # google-genai doesn't wrap transport failures (httpx.ConnectError,
+                # httpx.ReadTimeout); keep the traceback in the log, not on screen.
+                logger.error("Agent run failed", exc_info=error)
+                st.error(f"❌ Research failed ({type(error).__name__}): {error}")
+            return None
+    else:
+        report = run.future.result()
+
+    placeholder.markdown(report)
+    if run.ttft is not None and run.elapsed is not None:
+        st.caption(f"⏱️ Report first token {run.ttft:.2f}s into the answer turn · total {run.elapsed:.2f}s"
+                   f" · 🗄️ {run.cached_tokens}/{run.prompt_tokens} prompt tokens cached (prefix {SYSTEM_INSTRUCTION_HASH})"
+                   + ("" if started else " · shared run"))
+    return report
+
+# A fragment, so clicking "Run Analysis" reruns only this pane, not the
+# sidebar, model discovery and input widgets above it.
+@st.fragment
+def agent_pane(target_block, fields, api_key, selected_model):
+    if not api_key:
+        st.warning("⚠️ Please enter a Gemini API Key in the sidebar.")
+        return
+
+    cache_key = report_cache_key(selected_model, *fields)
+    last_key, last_report = st.session_state.get("last_report", (None, None))
+
+    run_col, regenerate_col = st.columns(2)
+    run_clicked = run_col.button("Run Analysis")
+    regenerate = regenerate_col.button("🔄 Regenerate", help="Replace the cached report with a fresh one, for everyone")
+
+    if run_clicked or regenerate:
+        store = get_report_store()
+        if regenerate:
+            # The store is process-wide: this retires the report for every session.
+            store.evict(cache_key)
+        report = store.lookup(cache_key)
+
+        if report is not None:
+            st.markdown("### 📊 Analyst Report")
+            st.markdown(report)
+            st.caption("⚡ Served from cache")
+        else:
+            report = research_live(target_block, api_key, selected_model, cache_key, regenerate)
+
+        if report:
+            st.session_state["last_report"] = (cache_key, report)
+    elif last_key == cache_key:
+        # Incidental reruns keep the report for the same target on screen.
+        st.markdown("### 📊 Analyst Report")
+        st.markdown(last_report)
 
 # --- App Logic ---
+if api_key:
+    warm_up(selected_model, key_digest(api_key), api_key)
+
 if target_company and business_unit:
-    final_prompt = build_prompt(target_company, business_unit, competitors, user_context)
+    fields = (target_company, business_unit, competitors, user_context)
+    target_block = build_target_block(*fields)
+    final_prompt = build_prompt(target_block)
     
     tab1, tab2 = st.tabs(["📋 Generate Prompt", "🤖 Run Agent"])
 
@@ -60,53 +597,4 @@ if target_company and business_unit:
         st.code(final_prompt, language="markdown")
 
     with tab2:
-        if not api_key:
-            st.warning("⚠️ Please enter a Gemini API Key in the sidebar.")
-        else:
-            if st.button("Run Analysis"):
-                st.info("🔍 Gemini is thinking... (This may take 30s)")
-                
-                # 1. Setup Tools
-                search = DuckDuckGoSearchRun()
-                tools = [search]
-                
-                # 2. Setup LLM (SWITCHED TO GEMINI)
-                llm = ChatGoogleGenerativeAI(
-                    model="gemini-pro", 
-                    google_api_key=api_key,
-                    temperature=0
-                )
-                
-                # 3. Define the ReAct Prompt (New Format)
-                template = '''Answer the following questions as best you can. You have access to the following tools:
-
-                {tools}
-
-                Use the following format:
-
-                Question: the input question you must answer
-                Thought: you should always think about what to do
-                Action: the action to take, should be one of [{tool_names}]
-                Action Input: the input to the action
-                Observation: the result of the action
-                ... (this Thought/Action/Action Input/Observation can repeat N times)
-                Thought: I now know the final answer
-                Final Answer: the final answer to the original input question
-
-                Begin!
-
-                Question: {input}
-                Thought:{agent_scratchpad}'''
-
-                prompt = PromptTemplate.from_template(template)
-
-                # 4. Create Agent (This fixes your error)
-                agent = create_react_agent(llm, tools, prompt)
-                agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=True, handle_parsing_errors=True)
-                
-                # 5. Run
-                st_callback = StreamlitCallbackHandler(st.container())
-                response = agent_executor.invoke({"input": final_prompt}, {"callbacks": [st_callback]})
-                
-                st.markdown("### 📊 Analyst Report")
-                st.markdown(response['output'])
+        agent_pane(target_block, fields, api_key, selected_model)
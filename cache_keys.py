@@ -0,0 +1,17 @@
+# --- Report Cache Keys ---
+# Kept out of app.py so the keying rules can be imported (and tested) without Streamlit.
+import hashlib
+
+from prompts import SYSTEM_INSTRUCTION
+
+# Computed once; report cache keys embed it so editing the instruction retires old reports.
+SYSTEM_INSTRUCTION_HASH = hashlib.blake2b(SYSTEM_INSTRUCTION.encode(), digest_size=8).hexdigest()
+
+def normalize_field(value):
+    return " ".join(value.split()).casefold()
+
+def report_cache_key(model_name, company, unit, comps, context):
+    # Keyed on the raw fields, not the rendered target block, so case and
+    # spacing variants ("Agilent", "agilent ", " AGILENT") share one entry.
+    fields = "\n".join(normalize_field(f) for f in (company, unit, comps, context))
+    return hashlib.sha1(f"{model_name}\n{SYSTEM_INSTRUCTION_HASH}\n{fields}".encode()).hexdigest()
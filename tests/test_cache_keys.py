@@ -0,0 +1,23 @@
+import unittest
+
+from cache_keys import report_cache_key
+
+MODEL = "models/gemini-2.5-flash"
+
+def key(company, unit="Life Sciences", comps="", context=""):
+    return report_cache_key(MODEL, company, unit, comps, context)
+
+class ReportCacheKeyTest(unittest.TestCase):
+    def test_case_and_spacing_variants_share_a_key(self):
+        self.assertEqual(key("Agilent"), key("agilent "))
+        self.assertEqual(key("Agilent"), key(" AGILENT"))
+        self.assertEqual(key("Thermo Fisher"), key("thermo   fisher"))
+        self.assertEqual(key("Agilent", unit="Life Sciences "), key("Agilent", unit="life  sciences"))
+
+    def test_different_targets_and_models_do_not_collide(self):
+        self.assertNotEqual(key("Agilent"), key("Illumina"))
+        self.assertNotEqual(key("Agilent", comps="Thermo"), key("Agilent", context="Thermo"))
+        self.assertNotEqual(key("Agilent"), report_cache_key("models/gemini-2.5-pro", "Agilent", "Life Sciences", "", ""))
+
+if __name__ == "__main__":
+    unittest.main()